@@ -1,10 +1,19 @@
 import dash
-from dash import dcc, html, Input, Output
+import flask
+from dash import dcc, html, Input, Output, State, ClientsideFunction
+from dash.exceptions import PreventUpdate
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 import re
 import os
+import json
+import hashlib
+from functools import lru_cache
+from search_index import query_terms, build_search_index, search_bitmap
+from rendering import webgl_point_threshold, max_line_points, scatter_trace, decimate
+from client_payload import encode_column, encode_labels, encode_json, encode_bitmap, figure_template
 
 #General Data
 df = pd.read_csv('geocoded_new_data.csv')
@@ -60,6 +69,8 @@ def get_top_aircraft(year_range):
     return aircraft_stats
 
 default_year_range = [1960, 2025]
+default_fatalities_range = [0, df['fatalities'].max()]
+default_card_years = [2010, 2025]
 top_aircraft = get_top_aircraft(default_year_range)
 
 def get_aircraft_svg(aircraft_type):
@@ -110,11 +121,72 @@ fig_heatmap.update_layout(
     showlegend=False
 )
 
+#Search Index
+search_indexes = {
+    "df": build_search_index(df),
+    "sankey": build_search_index(sankey_df),
+    "df2": build_search_index(df2)
+}
+
+@lru_cache(maxsize=128)
+def search_rows(table, query):
+    return search_bitmap(search_indexes[table], query)
+
+def search_mask(table, query):
+    return search_rows(table, " ".join(query_terms(query)))
+
+#Client-side Filtering
+clientside_filtering = os.environ.get("FLYSAFE_CLIENTSIDE_FILTERING") == "1"
+
+#Prerendered Defaults
+prerender_dir = "prerendered"
+prerender_manifest_path = os.path.join(prerender_dir, "manifest.json")
+hashed_file_pattern = re.compile(r"[\w.-]+\.[0-9a-f]{16}\.json")
+prerender_sources = ["app.py", "search_index.py", "rendering.py", "client_payload.py", "prerender.py",
+                     "geocoded_new_data.csv", "airplane_accidents_sankey.csv", "cleaned_flight_accidents.csv"]
+
+def build_fingerprint():
+    #A build is only valid for the code, data and flags it was made from
+    digest = hashlib.sha256()
+    for path in prerender_sources:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    digest.update(f"clientside_filtering={clientside_filtering}".encode())
+    return digest.hexdigest()
+
+def load_prerender_manifest():
+    #prerender.py sets FLYSAFE_PRERENDER=0 while it computes fresh defaults
+    if os.environ.get("FLYSAFE_PRERENDER") == "0" or not os.path.exists(prerender_manifest_path):
+        return None
+    try:
+        with open(prerender_manifest_path) as f:
+            manifest = json.load(f)
+    except json.JSONDecodeError:
+        return None
+    #A stale build would pin outdated defaults, so fall back to the live callbacks instead
+    return manifest if manifest.get("fingerprint") == build_fingerprint() else None
+
+prerender_manifest = load_prerender_manifest()
+prerendered = prerender_manifest is not None
+
 #UI Layout
 app = dash.Dash(__name__)
 app.title = "Airplane Accidents Dashboard 1960-2025"
 
 app.layout = html.Div([
+    #Client-side Data
+    *([
+        dcc.Store(id='accident-store', storage_type='session'),
+        dcc.Store(id='accident-store-version'),
+        dcc.Store(id='search-store')
+    ] if clientside_filtering else []),
+
+    #Prerendered Defaults
+    *([
+        dcc.Store(id='prerendered-outputs',
+                  data=[app.get_relative_path(f"/prerendered/{output['file']}") for output in prerender_manifest["outputs"]])
+    ] if prerendered else []),
+
     #Top Logo
     html.Div([
         html.Img(src="assets/logo.png", className="dashboard-logo"),
@@ -142,7 +214,7 @@ app.layout = html.Div([
         html.Div([
             html.Label("Fatalities Range", style={'fontWeight': 'bold', 'color': 'white'}),
             dcc.RangeSlider(
-                min=0, max=df['fatalities'].max(), value=[0, df['fatalities'].max()],
+                min=0, max=df['fatalities'].max(), value=default_fatalities_range,
                 marks={i: str(i) for i in range(0, int(df['fatalities'].max()) + 1, 300)}, id='fatalities-slider',
                 tooltip={"placement": "bottom", "always_visible": True},
                 step = 1,
@@ -150,6 +222,13 @@ app.layout = html.Div([
             )
     ], style={'flex': '1', 'padding-left': '30px'}),
 
+    html.Div([
+        html.Label("Search", style={'fontWeight': 'bold', 'color': 'white'}),
+        dcc.Input(id='search-box', type='text', value='', debounce=True,
+                  placeholder="Airport code, city or airline (e.g. MWX, Brussel, Jeju Air)",
+                  className="search-input")
+    ], style={'width': '100%', 'margin-top': '20px'}),
+
     html.Div([
         html.Label("View Mode", style={'fontWeight': 'bold', 'color': 'white'}),
         dcc.RadioItems(options=[
@@ -193,7 +272,7 @@ app.layout = html.Div([
                 dcc.Dropdown(
                     id="year-start",
                     options=[{"label": str(y), "value": y} for y in range(1960, 2026)],
-                    value=2010,
+                    value=default_card_years[0],
                     clearable=False,
                     className="year-dropdown"
                 ),
@@ -206,7 +285,7 @@ app.layout = html.Div([
                 dcc.Dropdown(
                     id="year-end",
                     options=[{"label": str(y), "value": y} for y in range(1960, 2026)],
-                    value=2025,
+                    value=default_card_years[1],
                     clearable=False,
                     className="year-dropdown"
                 )
@@ -349,16 +428,10 @@ app.layout = html.Div([
 })
 
 #Map
-@app.callback(
-    Output('accident-map', 'figure'),
-    [Input('year-slider', 'value'),
-     Input('aircraft-dropdown', 'value'),
-     Input('fatalities-slider', 'value'),
-     Input('view-mode', 'value')]
-)
-def update_map(year_range, selected_aircraft, fatalities_range, view_mode):
+def update_map(year_range, selected_aircraft, fatalities_range, view_mode, search_query):
     filtered_df = df[(df['year'] >= year_range[0]) & (df['year'] <= year_range[1]) & 
-                     (df['fatalities'] >= fatalities_range[0]) & (df['fatalities'] <= fatalities_range[1])]
+                     (df['fatalities'] >= fatalities_range[0]) & (df['fatalities'] <= fatalities_range[1]) &
+                     search_mask("df", search_query)]
 
     if selected_aircraft:
         filtered_df = filtered_df[filtered_df['type'].isin(selected_aircraft)]
@@ -394,15 +467,30 @@ def update_map(year_range, selected_aircraft, fatalities_range, view_mode):
     fig.update_layout(margin={"r": 0, "t": 0, "l": 0, "b": 0}, uirevision=False, font=dict(family="Roboto, sans-serif"))
     return fig
 
+#Registered only without client-side filtering, otherwise assets/clientside.js owns this output
+if not clientside_filtering:
+    app.callback(
+        Output('accident-map', 'figure'),
+        [Input('year-slider', 'value'),
+         Input('aircraft-dropdown', 'value'),
+         Input('fatalities-slider', 'value'),
+         Input('view-mode', 'value'),
+         Input('search-box', 'value')],
+        prevent_initial_call=prerendered
+    )(update_map)
+
 #Sankey Diagram
 @app.callback(
     Output('sankey-graph', 'figure'),
-    [Input('year-slider', 'value')]
+    [Input('year-slider', 'value'),
+     Input('search-box', 'value')],
+    prevent_initial_call=prerendered
 )
-def update_sankey(year_range):
+def update_sankey(year_range, search_query):
     filtered_df = sankey_df[
         (sankey_df["date"].dt.year >= year_range[0]) &
-        (sankey_df["date"].dt.year <= year_range[1])
+        (sankey_df["date"].dt.year <= year_range[1]) &
+        search_mask("sankey", search_query)
     ]
 
     source = []
@@ -485,7 +573,8 @@ def update_sankey(year_range):
     [Output(f"aircraft-title-{i+1}", "children") for i in range(3)] +
     [Output(f"aircraft-img-{i+1}", "src") for i in range(3)],
     [Input("year-start", "value"),
-     Input("year-end", "value")]
+     Input("year-end", "value")],
+    prevent_initial_call=prerendered
 )
 def update_aircraft_cards(year_start, year_end):
     year_range = [year_start, year_end]
@@ -501,8 +590,9 @@ def update_aircraft_cards(year_start, year_end):
             .groupby("year").agg({"Total Fatality": "sum", "type": "count"}).rename(columns={"type": "accidents"}).reset_index()
 
         #Fatalities
+        fatalities_data = decimate(aircraft_data, "year", "Total Fatality")
         fatalities_fig = go.Figure()
-        fatalities_fig.add_trace(go.Scatter(x=aircraft_data["year"], y=aircraft_data["Total Fatality"], mode="lines+markers",
+        fatalities_fig.add_trace(go.Scatter(x=fatalities_data["year"], y=fatalities_data["Total Fatality"], mode="lines+markers",
                                  name="Fatalities", line=dict(color="#8b52f7")))
         fatalities_fig.update_layout(
             margin=dict(l=25, r=25, t=45, b=15),
@@ -514,8 +604,9 @@ def update_aircraft_cards(year_start, year_end):
         fatalities_figs.append(fatalities_fig)
 
         #Accidents
+        accidents_data = decimate(aircraft_data, "year", "accidents")
         accidents_fig = go.Figure()
-        accidents_fig.add_trace(go.Scatter(x=aircraft_data["year"], y=aircraft_data["accidents"], mode="lines+markers",
+        accidents_fig.add_trace(go.Scatter(x=accidents_data["year"], y=accidents_data["accidents"], mode="lines+markers",
                                  name="Accidents", line=dict(color="#FF983D")))
         accidents_fig.update_layout(
             margin=dict(l=25, r=25, t=15, b=15),
@@ -532,15 +623,13 @@ def update_aircraft_cards(year_start, year_end):
     return fatalities_figs + accidents_figs + titles + images
 
 #Chart1
-@app.callback(
-    Output('chart1', 'figure'),
-    [Input('fatalities-slider', 'value')]
-)
-def update_accidents_chart(fatalities_range):
+def update_accidents_chart(fatalities_range, search_query):
     filtered_df = df[(df['fatalities'] >= fatalities_range[0]) & 
-                           (df['fatalities'] <= fatalities_range[1])]
+                           (df['fatalities'] <= fatalities_range[1]) &
+                           search_mask("df", search_query)]
 
     accidents_per_year = filtered_df.groupby('year').size().reset_index(name='accidents')
+    accidents_per_year = decimate(accidents_per_year, 'year', 'accidents')
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -575,16 +664,22 @@ def update_accidents_chart(fatalities_range):
 
     return fig
 
+if not clientside_filtering:
+    app.callback(
+        Output('chart1', 'figure'),
+        [Input('fatalities-slider', 'value'),
+         Input('search-box', 'value')],
+        prevent_initial_call=prerendered
+    )(update_accidents_chart)
+
 #Chart2
-@app.callback(
-    Output('chart2', 'figure'),
-    [Input('fatalities-slider', 'value')]
-)
-def update_fatalities_chart(fatalities_range):
+def update_fatalities_chart(fatalities_range, search_query):
     filtered_df = df[(df['fatalities'] >= fatalities_range[0]) & 
-                     (df['fatalities'] <= fatalities_range[1])]
+                     (df['fatalities'] <= fatalities_range[1]) &
+                     search_mask("df", search_query)]
 
     fatalities_per_year = filtered_df.groupby('year')['fatalities'].sum().reset_index()
+    fatalities_per_year = decimate(fatalities_per_year, 'year', 'fatalities')
 
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -620,19 +715,25 @@ def update_fatalities_chart(fatalities_range):
 
     return fig
 
+if not clientside_filtering:
+    app.callback(
+        Output('chart2', 'figure'),
+        [Input('fatalities-slider', 'value'),
+         Input('search-box', 'value')],
+        prevent_initial_call=prerendered
+    )(update_fatalities_chart)
+
 #Chart3
-@app.callback(
-    Output('chart3', 'figure'),
-    [Input('fatalities-slider', 'value')]
-)
-def update_capacity_chart(fatalities_range):
+def update_capacity_chart(fatalities_range, search_query):
     filtered_df = df2[(df2['Total Fatality'] >= fatalities_range[0]) & 
-                      (df2['Total Fatality'] <= fatalities_range[1])]
+                      (df2['Total Fatality'] <= fatalities_range[1]) &
+                      search_mask("df2", search_query)]
 
     filtered_df = filtered_df.dropna(subset=["capacity"])
 
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
+    fig.add_trace(scatter_trace(
+        len(filtered_df),
         x=filtered_df['year'], 
         y=filtered_df['capacity'],
         mode='markers',
@@ -643,8 +744,8 @@ def update_capacity_chart(fatalities_range):
             showscale=True,
             line=dict(width=0)
         ),
-        text=filtered_df['type'] + "<br>Fatalities: " + filtered_df['Total Fatality'].astype(str),
-        hoverinfo="text"
+        customdata=filtered_df[['type', 'Total Fatality']].to_numpy(),
+        hovertemplate="%{customdata[0]}<br>Fatalities: %{customdata[1]}<extra></extra>"
     ))
 
     fig.update_layout(
@@ -681,13 +782,18 @@ def update_capacity_chart(fatalities_range):
 
     return fig
 
+if not clientside_filtering:
+    app.callback(
+        Output('chart3', 'figure'),
+        [Input('fatalities-slider', 'value'),
+         Input('search-box', 'value')],
+        prevent_initial_call=prerendered
+    )(update_capacity_chart)
+
 #Recent 5
-@app.callback(
-    Output('latest-accidents-table', 'figure'),
-    [Input('year-slider', 'value')]
-)
-def update_latest_accidents(year_range):
-    filtered_df = df[(df['year'] >= year_range[0]) & (df['year'] <= year_range[1])]
+def update_latest_accidents(year_range, search_query):
+    filtered_df = df[(df['year'] >= year_range[0]) & (df['year'] <= year_range[1]) &
+                     search_mask("df", search_query)]
     latest_accidents = filtered_df.sort_values(by="date", ascending=False).head(5)
 
     col_widths = [12, 20, 20, 38, 10]
@@ -728,6 +834,186 @@ def update_latest_accidents(year_range):
 
     return fig
 
+if not clientside_filtering:
+    app.callback(
+        Output('latest-accidents-table', 'figure'),
+        [Input('year-slider', 'value'),
+         Input('search-box', 'value')],
+        prevent_initial_call=prerendered
+    )(update_latest_accidents)
+
+#Client-side Filtering
+@lru_cache(maxsize=1)
+def build_accident_payload():
+    type_codes, type_labels = encode_labels(df["type"])
+    location_codes, location_labels = encode_labels(df["location"])
+    operator_codes, operator_labels = encode_labels(df["operator"])
+    days = pd.to_datetime(df["date"]).values.astype("datetime64[D]").astype(np.int64)
+    capacity_type_codes, capacity_type_labels = encode_labels(df2["type"])
+
+    figures = {}
+    for name, fig in [
+        ("scatter", update_map(default_year_range, [], default_fatalities_range, "scatter", "")),
+        ("heatmap", update_map(default_year_range, [], default_fatalities_range, "heatmap", "")),
+        ("chart1", update_accidents_chart(default_fatalities_range, "")),
+        ("chart2", update_fatalities_chart(default_fatalities_range, "")),
+        ("chart3", update_capacity_chart(default_fatalities_range, "")),
+        ("table", update_latest_accidents(default_year_range, ""))
+    ]:
+        figures[name], template = figure_template(fig)
+
+    payload = {
+        "tables": {
+            "df": {
+                "rows": len(df),
+                "columns": {
+                    "year": encode_column(df["year"], "<i2"),
+                    "fatalities": encode_column(df["fatalities"], "<i4"),
+                    "type": encode_column(type_codes, "<i2"),
+                    "location": encode_column(location_codes, "<i4"),
+                    "operator": encode_column(operator_codes, "<i4"),
+                    "date": encode_column(days, "<i4"),
+                    "lat": encode_column(df["Latitude"], "<f4"),
+                    "lon": encode_column(df["Longitude"], "<f4")
+                }
+            },
+            #Cleaned data behind the capacity chart
+            "df2": {
+                "rows": len(df2),
+                "columns": {
+                    "year": encode_column(df2["year"], "<i2"),
+                    "fatalities": encode_column(df2["Total Fatality"], "<i4"),
+                    "capacity": encode_column(df2["capacity"], "<f4"),
+                    "type": encode_column(capacity_type_codes, "<i2")
+                }
+            }
+        },
+        #Label tables and figure templates are compressed like the columns
+        "meta": encode_json({
+            "labels": {
+                "df": {"type": type_labels, "location": location_labels, "operator": operator_labels},
+                "df2": {"type": capacity_type_labels}
+            },
+            "figures": figures,
+            "template": template,
+            "webgl_point_threshold": webgl_point_threshold,
+            "max_line_points": max_line_points
+        })
+    }
+    payload["version"] = hashlib.sha1(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:12]
+    return payload
+
+if clientside_filtering:
+    #Only the version travels back to the server, so the table is sent once per session
+    app.clientside_callback(
+        ClientsideFunction(namespace="flysafe", function_name="store_version"),
+        Output('accident-store-version', 'data'),
+        [Input('accident-store', 'modified_timestamp')],
+        [State('accident-store', 'data')]
+    )
+
+    @app.callback(
+        Output('accident-store', 'data'),
+        [Input('accident-store-version', 'data')]
+    )
+    def load_accident_store(stored_version):
+        payload = build_accident_payload()
+        if stored_version == payload["version"]:
+            raise PreventUpdate
+        return payload
+
+    @app.callback(
+        Output('search-store', 'data'),
+        [Input('search-box', 'value')]
+    )
+    def update_search_store(search_query):
+        if not query_terms(search_query):
+            return None
+        return {table: encode_bitmap(search_mask(table, search_query)) for table in ("df", "df2")}
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="flysafe", function_name="update_map"),
+        Output('accident-map', 'figure'),
+        [Input('year-slider', 'value'),
+         Input('aircraft-dropdown', 'value'),
+         Input('fatalities-slider', 'value'),
+         Input('view-mode', 'value'),
+         Input('accident-store', 'data'),
+         Input('search-store', 'data')]
+    )
+
+    #The animation ignores the filters and is too heavy to rebuild in the browser
+    @app.callback(
+        Output('accident-map', 'figure', allow_duplicate=True),
+        [Input('view-mode', 'value')],
+        prevent_initial_call=True
+    )
+    def update_map_animation(view_mode):
+        if view_mode != 'animation':
+            raise PreventUpdate
+        return update_map(default_year_range, [], default_fatalities_range, view_mode, "")
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="flysafe", function_name="update_accidents_chart"),
+        Output('chart1', 'figure'),
+        [Input('fatalities-slider', 'value'),
+         Input('accident-store', 'data'),
+         Input('search-store', 'data')]
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="flysafe", function_name="update_fatalities_chart"),
+        Output('chart2', 'figure'),
+        [Input('fatalities-slider', 'value'),
+         Input('accident-store', 'data'),
+         Input('search-store', 'data')]
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="flysafe", function_name="update_capacity_chart"),
+        Output('chart3', 'figure'),
+        [Input('fatalities-slider', 'value'),
+         Input('accident-store', 'data'),
+         Input('search-store', 'data')]
+    )
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="flysafe", function_name="update_latest_accidents"),
+        Output('latest-accidents-table', 'figure'),
+        [Input('year-slider', 'value'),
+         Input('accident-store', 'data'),
+         Input('search-store', 'data')]
+    )
+
+#Prerendered Defaults
+if prerendered:
+    #Hashed file names change whenever the content does, so browsers and CDNs can keep them forever
+    @app.server.route("/prerendered/<path:filename>")
+    def serve_prerendered(filename):
+        #The manifest and anything else without a content hash is not served
+        if not hashed_file_pattern.fullmatch(filename):
+            flask.abort(404)
+        response = flask.send_from_directory(prerender_dir, filename, max_age=31536000)
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    if "layout" in prerender_manifest:
+        #The layout URL is fixed by Dash, so revalidate it against the content hash instead
+        def serve_prerendered_layout():
+            layout_file = prerender_manifest["layout"]
+            return flask.send_file(os.path.join(prerender_dir, layout_file), mimetype="application/json",
+                                   etag=layout_file, max_age=0, conditional=True)
+
+        app.server.view_functions[app.config.routes_pathname_prefix + "_dash-layout"] = serve_prerendered_layout
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="flysafe", function_name="load_prerendered"),
+        [Output(output["id"], output["property"], allow_duplicate=True) for output in prerender_manifest["outputs"]],
+        [Input('prerendered-outputs', 'data')],
+        prevent_initial_call='initial_duplicate'
+    )
+
 if __name__ == '__main__':
     app.run_server(debug=False)
 
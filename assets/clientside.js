@@ -0,0 +1,283 @@
+// Clientside callbacks for the dashboard.
+//
+// Client-side filtering (FLYSAFE_CLIENTSIDE_FILTERING=1): the accident tables
+// arrive once per session in `accident-store` as zlib-compressed columns,
+// with the label tables and figure templates compressed alongside them.
+//
+// Prerendered defaults (python prerender.py): the initial figures are fetched
+// from content-hashed static files instead of running the server callbacks.
+
+const typedArrays = {
+  int16: Int16Array,
+  int32: Int32Array,
+  float32: Float32Array,
+};
+
+let decodedStore = { version: null, promise: null };
+let decodedSearch = { key: null, promise: null };
+
+async function inflate(encoded) {
+  const bytes = Uint8Array.from(atob(encoded), (c) => c.charCodeAt(0));
+  const stream = new Blob([bytes])
+    .stream()
+    .pipeThrough(new DecompressionStream("deflate"));
+  return new Uint8Array(await new Response(stream).arrayBuffer());
+}
+
+async function decodeStore(store) {
+  const meta = JSON.parse(new TextDecoder().decode(await inflate(store.meta)));
+  const tables = {};
+  for (const [tableName, table] of Object.entries(store.tables)) {
+    const columns = {};
+    for (const [name, column] of Object.entries(table.columns)) {
+      const bytes = await inflate(column.data);
+      columns[name] = new typedArrays[column.dtype](bytes.buffer);
+    }
+    tables[tableName] = { rows: table.rows, columns, labels: meta.labels[tableName] };
+  }
+  return { ...meta, tables };
+}
+
+function loadStore(store) {
+  if (decodedStore.version !== store.version) {
+    decodedStore = { version: store.version, promise: decodeStore(store) };
+  }
+  return decodedStore.promise;
+}
+
+// Search results arrive as one packed row bitmap per table
+function loadSearch(searchBits) {
+  if (!searchBits) {
+    return Promise.resolve(null);
+  }
+  const key = searchBits.df + searchBits.df2;
+  if (decodedSearch.key !== key) {
+    const decoded = Promise.all([inflate(searchBits.df), inflate(searchBits.df2)]).then(([df, df2]) => ({ df, df2 }));
+    decodedSearch = { key, promise: decoded };
+  }
+  return decodedSearch.promise;
+}
+
+async function loadTable(tableName, store, searchBits) {
+  const [data, bitmaps] = await Promise.all([loadStore(store), loadSearch(searchBits)]);
+  return { data, table: data.tables[tableName], bitmap: bitmaps && bitmaps[tableName] };
+}
+
+function filterRows(table, bitmap, yearRange, fatalitiesRange, selectedAircraft) {
+  const { year, fatalities, type } = table.columns;
+  const typeCodes =
+    selectedAircraft && selectedAircraft.length
+      ? new Set(selectedAircraft.map((t) => table.labels.type.indexOf(t)))
+      : null;
+
+  const rows = [];
+  for (let i = 0; i < table.rows; i++) {
+    if (yearRange && (year[i] < yearRange[0] || year[i] > yearRange[1])) continue;
+    if (fatalitiesRange && (fatalities[i] < fatalitiesRange[0] || fatalities[i] > fatalitiesRange[1])) continue;
+    if (typeCodes && !typeCodes.has(type[i])) continue;
+    if (bitmap && !((bitmap[i >> 3] >> (i & 7)) & 1)) continue;
+    rows.push(i);
+  }
+  return rows;
+}
+
+function figureFrom(data, name) {
+  const figure = JSON.parse(JSON.stringify(data.figures[name]));
+  figure.layout.template = data.template;
+  return figure;
+}
+
+function formatDate(days) {
+  return new Date(days * 86400000).toISOString().slice(0, 10);
+}
+
+function mean(values) {
+  let sum = 0;
+  let count = 0;
+  for (const v of values) {
+    if (!Number.isNaN(v)) {
+      sum += v;
+      count++;
+    }
+  }
+  return count ? sum / count : null;
+}
+
+function perYear(rows, columns, weight) {
+  const totals = new Map();
+  for (const i of rows) {
+    const y = columns.year[i];
+    totals.set(y, (totals.get(y) || 0) + (weight ? weight[i] : 1));
+  }
+  const years = Array.from(totals.keys()).sort((a, b) => a - b);
+  return { x: years, y: years.map((y) => totals.get(y)) };
+}
+
+// Same Largest-Triangle-Three-Buckets decimation as lttb_indices in rendering.py
+function lttbIndices(x, y, threshold) {
+  const n = x.length;
+  if (n <= threshold || threshold < 3) {
+    return x.map((_, i) => i);
+  }
+
+  const bucketSize = (n - 2) / (threshold - 2);
+  const indices = [0];
+  let a = 0;
+  for (let i = 0; i < threshold - 2; i++) {
+    const start = Math.floor(i * bucketSize) + 1;
+    const end = Math.floor((i + 1) * bucketSize) + 1;
+    const nextEnd = Math.min(Math.floor((i + 2) * bucketSize) + 1, n);
+
+    let avgX = 0;
+    let avgY = 0;
+    for (let j = end; j < nextEnd; j++) {
+      avgX += x[j];
+      avgY += y[j];
+    }
+    avgX /= nextEnd - end;
+    avgY /= nextEnd - end;
+
+    let maxArea = -1;
+    let next = start;
+    for (let j = start; j < end; j++) {
+      const area = Math.abs((x[a] - avgX) * (y[j] - y[a]) - (x[a] - x[j]) * (avgY - y[a]));
+      if (area > maxArea) {
+        maxArea = area;
+        next = j;
+      }
+    }
+    a = next;
+    indices.push(a);
+  }
+
+  indices.push(n - 1);
+  return indices;
+}
+
+function decimate(series, threshold) {
+  const indices = lttbIndices(series.x, series.y, threshold);
+  return { x: indices.map((i) => series.x[i]), y: indices.map((i) => series.y[i]) };
+}
+
+async function annualChart(name, weightColumn, fatalitiesRange, store, searchBits) {
+  if (!store) {
+    return window.dash_clientside.no_update;
+  }
+  const { data, table, bitmap } = await loadTable("df", store, searchBits);
+  const rows = filterRows(table, bitmap, null, fatalitiesRange, null);
+
+  const figure = figureFrom(data, name);
+  const series = perYear(rows, table.columns, weightColumn && table.columns[weightColumn]);
+  Object.assign(figure.data[0], decimate(series, data.max_line_points));
+  return figure;
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+  flysafe: {
+    load_prerendered: function (urls) {
+      // A missing file (e.g. removed by a later deploy) leaves only that output empty
+      const load = (url) =>
+        fetch(url)
+          .then((response) => (response.ok ? response.json() : Promise.reject(new Error(`${response.status} ${url}`))))
+          .catch((error) => {
+            console.warn("Prerendered output unavailable", error);
+            return window.dash_clientside.no_update;
+          });
+      return Promise.all(urls.map(load));
+    },
+
+    store_version: function (modifiedTimestamp, store) {
+      return store ? store.version : null;
+    },
+
+    update_map: async function (yearRange, selectedAircraft, fatalitiesRange, viewMode, store, searchBits) {
+      if (!store || viewMode === "animation") {
+        return window.dash_clientside.no_update;
+      }
+      const { data, table, bitmap } = await loadTable("df", store, searchBits);
+      const { columns, labels } = table;
+      const rows = filterRows(table, bitmap, yearRange, fatalitiesRange, selectedAircraft);
+
+      const lat = rows.map((i) => columns.lat[i]);
+      const lon = rows.map((i) => columns.lon[i]);
+      const fatalities = rows.map((i) => columns.fatalities[i]);
+
+      const figure = figureFrom(data, viewMode);
+      const trace = figure.data[0];
+      Object.assign(trace, { lat, lon });
+
+      if (viewMode === "heatmap") {
+        trace.z = fatalities;
+        return figure;
+      }
+
+      trace.hovertext = rows.map((i) => labels.type[columns.type[i]]);
+      trace.customdata = rows.map((i) => [
+        formatDate(columns.date[i]),
+        columns.fatalities[i],
+        labels.location[columns.location[i]],
+      ]);
+      trace.marker.color = fatalities;
+      trace.marker.size = fatalities;
+      // Same scaling plotly.express applies for size_max=15
+      trace.marker.sizeref = fatalities.reduce((a, b) => Math.max(a, b), 1) / 15 ** 2;
+
+      const center = { lat: mean(lat), lon: mean(lon) };
+      if (center.lat !== null && center.lon !== null) {
+        figure.layout.mapbox.center = center;
+      }
+      return figure;
+    },
+
+    update_accidents_chart: function (fatalitiesRange, store, searchBits) {
+      return annualChart("chart1", null, fatalitiesRange, store, searchBits);
+    },
+
+    update_fatalities_chart: function (fatalitiesRange, store, searchBits) {
+      return annualChart("chart2", "fatalities", fatalitiesRange, store, searchBits);
+    },
+
+    update_capacity_chart: async function (fatalitiesRange, store, searchBits) {
+      if (!store) {
+        return window.dash_clientside.no_update;
+      }
+      const { data, table, bitmap } = await loadTable("df2", store, searchBits);
+      const { columns, labels } = table;
+      const rows = filterRows(table, bitmap, null, fatalitiesRange, null).filter(
+        (i) => !Number.isNaN(columns.capacity[i])
+      );
+      const fatalities = rows.map((i) => columns.fatalities[i]);
+
+      const figure = figureFrom(data, "chart3");
+      const trace = figure.data[0];
+      trace.type = rows.length > data.webgl_point_threshold ? "scattergl" : "scatter";
+      trace.x = rows.map((i) => columns.year[i]);
+      trace.y = rows.map((i) => columns.capacity[i]);
+      trace.marker.size = fatalities.map((f) => f / 20);
+      trace.marker.color = fatalities;
+      trace.customdata = rows.map((i) => [labels.type[columns.type[i]], columns.fatalities[i]]);
+      return figure;
+    },
+
+    update_latest_accidents: async function (yearRange, store, searchBits) {
+      if (!store) {
+        return window.dash_clientside.no_update;
+      }
+      const { data, table, bitmap } = await loadTable("df", store, searchBits);
+      const { columns, labels } = table;
+      const rows = filterRows(table, bitmap, yearRange, null, null)
+        .sort((a, b) => columns.date[b] - columns.date[a])
+        .slice(0, 5);
+
+      const figure = figureFrom(data, "table");
+      figure.data[0].cells.values = [
+        rows.map((i) => formatDate(columns.date[i])),
+        rows.map((i) => labels.type[columns.type[i]]),
+        rows.map((i) => labels.operator[columns.operator[i]]),
+        rows.map((i) => labels.location[columns.location[i]]),
+        rows.map((i) => columns.fatalities[i]),
+      ];
+      return figure;
+    },
+  },
+});
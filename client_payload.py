@@ -0,0 +1,33 @@
+import json
+import zlib
+import base64
+import numpy as np
+import pandas as pd
+
+#Encoders for the client-side filtering payload; assets/clientside.js decodes them
+def encode_column(values, dtype):
+    data = np.ascontiguousarray(values, dtype=dtype)
+    return {"dtype": data.dtype.name, "data": base64.b64encode(zlib.compress(data.tobytes(), 9)).decode("ascii")}
+
+def encode_labels(values):
+    #Missing strings get their own label instead of pandas' -1 sentinel
+    codes, labels = pd.factorize(values.fillna("Unknown"))
+    return codes, labels.tolist()
+
+def encode_json(value):
+    return base64.b64encode(zlib.compress(json.dumps(value).encode(), 9)).decode("ascii")
+
+def encode_bitmap(bitmap):
+    return base64.b64encode(zlib.compress(np.packbits(bitmap, bitorder="little").tobytes(), 9)).decode("ascii")
+
+def figure_template(fig):
+    #Keep the figure's styling and drop the per-row data the browser fills back in
+    spec = json.loads(fig.to_json())
+    template = spec["layout"].pop("template")
+    for trace in spec["data"]:
+        for key in ("x", "y", "lat", "lon", "z", "text", "hovertext", "customdata"):
+            trace.pop(key, None)
+        for key in ("color", "size"):
+            trace.get("marker", {}).pop(key, None)
+        trace.get("cells", {}).pop("values", None)
+    return spec, template
@@ -0,0 +1,85 @@
+import os
+import json
+import hashlib
+import importlib
+from plotly.io.json import to_json_plotly
+
+#Build step: prerender the default view into content-hashed files under prerendered/.
+#Run it from the project root before starting the server, e.g. `python prerender.py && gunicorn app:server`.
+
+def default_outputs(dashboard):
+    card_outputs = [(f"chart-fatalities-{i+1}", "figure") for i in range(3)] + \
+                   [(f"chart-accidents-{i+1}", "figure") for i in range(3)] + \
+                   [(f"aircraft-title-{i+1}", "children") for i in range(3)] + \
+                   [(f"aircraft-img-{i+1}", "src") for i in range(3)]
+
+    return [
+        (("accident-map", "figure"), dashboard.update_map(dashboard.default_year_range, [], dashboard.default_fatalities_range, "scatter", "")),
+        (("sankey-graph", "figure"), dashboard.update_sankey(dashboard.default_year_range, "")),
+        *zip(card_outputs, dashboard.update_aircraft_cards(*dashboard.default_card_years)),
+        (("chart1", "figure"), dashboard.update_accidents_chart(dashboard.default_fatalities_range, "")),
+        (("chart2", "figure"), dashboard.update_fatalities_chart(dashboard.default_fatalities_range, "")),
+        (("chart3", "figure"), dashboard.update_capacity_chart(dashboard.default_fatalities_range, "")),
+        (("latest-accidents-table", "figure"), dashboard.update_latest_accidents(dashboard.default_year_range, ""))
+    ]
+
+def write_hashed(dashboard, name, content):
+    digest = hashlib.sha256(content.encode()).hexdigest()[:16]
+    filename = f"{name}.{digest}.json"
+    with open(os.path.join(dashboard.prerender_dir, filename), "w") as f:
+        f.write(content)
+    return filename
+
+def read_manifest(dashboard):
+    if not os.path.exists(dashboard.prerender_manifest_path):
+        return None
+    try:
+        with open(dashboard.prerender_manifest_path) as f:
+            return json.load(f)
+    except json.JSONDecodeError:
+        return None
+
+def write_manifest(dashboard, manifest):
+    #Write then rename, so the server never reads a half-written manifest
+    temp_path = dashboard.prerender_manifest_path + ".tmp"
+    with open(temp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(temp_path, dashboard.prerender_manifest_path)
+
+def manifest_files(manifest):
+    files = {output["file"] for output in manifest["outputs"]}
+    if "layout" in manifest:
+        files.add(manifest["layout"])
+    return files
+
+def main():
+    #Compute the defaults with the live callbacks, not a previous build
+    os.environ["FLYSAFE_PRERENDER"] = "0"
+    import app as dashboard
+
+    os.makedirs(dashboard.prerender_dir, exist_ok=True)
+    previous = read_manifest(dashboard)
+
+    manifest = {"fingerprint": dashboard.build_fingerprint(), "outputs": [
+        {"id": component_id, "property": prop,
+         "file": write_hashed(dashboard, f"{component_id}.{prop}", to_json_plotly(value))}
+        for (component_id, prop), value in default_outputs(dashboard)
+    ]}
+    write_manifest(dashboard, manifest)
+
+    #Reload with the manifest in place so the layout carries the prerendered file URLs
+    os.environ["FLYSAFE_PRERENDER"] = "1"
+    importlib.reload(dashboard)
+    manifest["layout"] = write_hashed(dashboard, "layout", to_json_plotly(dashboard.app.layout))
+    write_manifest(dashboard, manifest)
+
+    #Pages opened before this deploy still reference the previous build, so only older files go
+    keep = manifest_files(manifest) | (manifest_files(previous) if previous else set())
+    for filename in os.listdir(dashboard.prerender_dir):
+        if dashboard.hashed_file_pattern.fullmatch(filename) and filename not in keep:
+            os.remove(os.path.join(dashboard.prerender_dir, filename))
+
+    print(f"Prerendered {len(manifest['outputs'])} outputs and the layout into {dashboard.prerender_dir}/")
+
+if __name__ == '__main__':
+    main()
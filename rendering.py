@@ -0,0 +1,40 @@
+import numpy as np
+import plotly.graph_objects as go
+
+#Large-point rendering helpers.
+#Line series are LTTB-capped below the WebGL threshold, so they always stay SVG;
+#only unbounded marker traces such as the capacity chart switch to WebGL
+webgl_point_threshold = 1000
+max_line_points = 500
+
+def scatter_trace(n_points, **kwargs):
+    #SVG markers get slow past a few thousand points, WebGL does not
+    return (go.Scattergl if n_points > webgl_point_threshold else go.Scatter)(**kwargs)
+
+def lttb_indices(x, y, threshold=max_line_points):
+    #Largest-Triangle-Three-Buckets: keep the point per bucket that best preserves the line shape
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n <= threshold or threshold < 3:
+        return np.arange(n)
+
+    bucket_size = (n - 2) / (threshold - 2)
+    indices = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * bucket_size) + 1
+        end = int((i + 1) * bucket_size) + 1
+        next_end = min(int((i + 2) * bucket_size) + 1, n)
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices.append(a)
+
+    indices.append(n - 1)
+    return np.array(indices)
+
+def decimate(frame, x, y):
+    return frame.iloc[lttb_indices(frame[x], frame[y])]
@@ -0,0 +1,64 @@
+import re
+import numpy as np
+from bisect import bisect_left
+
+#Inverted index over the free-text columns, queried by prefix
+search_columns = ["location", "operator", "type"]
+token_pattern = re.compile(r"[a-z0-9]+")
+query_pattern = re.compile(r"[A-Za-z0-9]+")
+airport_code_pattern = re.compile(r"\(([A-Z0-9]{3,4})(?:/([A-Z0-9]{3,4}))?\)")
+
+def tokenize(text):
+    return token_pattern.findall(text.lower()) if isinstance(text, str) else []
+
+def query_terms(query):
+    #Case is kept so an uppercase term can be told apart from an ordinary word
+    return query_pattern.findall(query) if isinstance(query, str) else []
+
+def extract_airport_codes(text):
+    if not isinstance(text, str):
+        return []
+    return [code.lower() for match in airport_code_pattern.finditer(text) for code in match.groups() if code]
+
+def build_search_index(frame):
+    postings = {}
+    codes = {}
+    for row_id, values in enumerate(zip(*(frame[col] for col in search_columns))):
+        for value in values:
+            for token in tokenize(value):
+                postings.setdefault(token, set()).add(row_id)
+            for code in extract_airport_codes(value):
+                codes.setdefault(code, set()).add(row_id)
+
+    return {
+        "size": len(frame),
+        "vocabulary": sorted(postings),
+        "postings": {token: np.fromiter(sorted(ids), dtype=np.int32) for token, ids in postings.items()},
+        "codes": {code: np.fromiter(sorted(ids), dtype=np.int32) for code, ids in codes.items()}
+    }
+
+def match_term(index, term):
+    #An uppercase term such as "BRU" that is an IATA/ICAO code matches the code and the exact word,
+    #so it skips "brussel" but "LOS ANGELES" still works; other terms match by prefix
+    lowered = term.lower()
+    if term.isupper() and lowered in index["codes"]:
+        exact_word = index["postings"].get(lowered, np.empty(0, dtype=np.int32))
+        return np.union1d(index["codes"][lowered], exact_word)
+
+    vocabulary = index["vocabulary"]
+    start = bisect_left(vocabulary, lowered)
+    end = start
+    while end < len(vocabulary) and vocabulary[end].startswith(lowered):
+        end += 1
+
+    if start == end:
+        return np.empty(0, dtype=np.int32)
+    return np.concatenate([index["postings"][token] for token in vocabulary[start:end]])
+
+def search_bitmap(index, query):
+    bitmap = np.ones(index["size"], dtype=bool)
+    for term in query_terms(query):
+        term_bitmap = np.zeros(index["size"], dtype=bool)
+        term_bitmap[match_term(index, term)] = True
+        bitmap &= term_bitmap
+    return bitmap
@@ -0,0 +1,66 @@
+import json
+import zlib
+import base64
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from client_payload import encode_column, encode_labels, encode_json, encode_bitmap, figure_template
+
+frame = pd.DataFrame({
+    "year": [1961, 1975, 1988, 1999, 2004, 2013, 2022],
+    "fatalities": [0, 12, 583, 7, 230, 45, 3],
+    "type": ["B747", "A320", None, "B747", "DC-9", None, "A320"],
+    "lat": [33.94, 37.62, 28.56, 6.58, 32.73, 50.90, 19.44],
+    "lon": [-118.41, -122.38, 77.10, 3.32, -117.19, 4.48, -99.07]
+})
+
+def decode(encoded):
+    return zlib.decompress(base64.b64decode(encoded))
+
+def test_columns_round_trip_with_their_dtype():
+    for name, dtype in [("year", "<i2"), ("fatalities", "<i4"), ("lat", "<f4")]:
+        column = encode_column(frame[name], dtype)
+        decoded = np.frombuffer(decode(column["data"]), dtype=column["dtype"])
+        assert column["dtype"] == np.dtype(dtype).name
+        np.testing.assert_array_equal(decoded, frame[name].to_numpy().astype(dtype))
+
+def test_missing_labels_get_their_own_code():
+    codes, labels = encode_labels(frame["type"])
+    assert codes.min() >= 0
+    assert [labels[c] for c in codes] == frame["type"].fillna("Unknown").tolist()
+
+def test_json_and_bitmaps_round_trip():
+    assert json.loads(decode(encode_json({"labels": ["B747", "Unknown"]}))) == {"labels": ["B747", "Unknown"]}
+
+    bitmap = frame["fatalities"].to_numpy() > 10
+    unpacked = np.unpackbits(np.frombuffer(decode(encode_bitmap(bitmap)), dtype=np.uint8), bitorder="little")
+    np.testing.assert_array_equal(unpacked[:len(frame)].astype(bool), bitmap)
+
+def row_arrays(value):
+    #Any typed array, or a list as long as the frame, is per-row data that should have been dropped
+    if isinstance(value, dict):
+        if "bdata" in value:
+            return [value]
+        return [found for item in value.values() for found in row_arrays(item)]
+    if isinstance(value, list):
+        return [value] if len(value) == len(frame) else [found for item in value for found in row_arrays(item)]
+    return []
+
+def test_figure_templates_keep_styling_but_no_row_data():
+    figures = [
+        px.scatter_mapbox(frame, lat="lat", lon="lon", color="fatalities", size="fatalities", hover_name="type",
+                          custom_data=["year", "fatalities"], size_max=15, mapbox_style="carto-positron"),
+        px.density_mapbox(frame, lat="lat", lon="lon", z="fatalities", radius=10),
+        go.Figure(go.Scatter(x=frame["year"], y=frame["fatalities"], mode="lines", line=dict(color="#d62728"))),
+        go.Figure(go.Table(header=dict(values=["Year", "Type"]), cells=dict(values=[frame["year"], frame["type"]])))
+    ]
+    for fig in figures:
+        spec, template = figure_template(fig)
+        assert template == json.loads(fig.to_json())["layout"]["template"]
+        assert "template" not in spec["layout"]
+        assert row_arrays(spec["data"]) == []
+        assert [trace["type"] for trace in spec["data"]] == [trace.type for trace in fig.data]
+
+    spec, _ = figure_template(figures[2])
+    assert spec["data"][0]["line"]["color"] == "#d62728"
@@ -0,0 +1,31 @@
+import numpy as np
+import plotly.graph_objects as go
+from rendering import webgl_point_threshold, scatter_trace, lttb_indices
+
+rng = np.random.default_rng(0)
+x = np.arange(2000)
+y = rng.normal(size=2000).cumsum()
+
+def test_short_series_are_kept_whole():
+    for n in (0, 1, 2, 10, 500):
+        assert lttb_indices(x[:n], y[:n], threshold=500).tolist() == list(range(n))
+
+def test_decimated_series_keep_the_end_points():
+    indices = lttb_indices(x, y, threshold=100)
+    assert indices[0] == 0
+    assert indices[-1] == len(x) - 1
+
+def test_decimated_series_have_threshold_points_in_order():
+    for threshold in (3, 50, 500, 1999):
+        indices = lttb_indices(x, y, threshold=threshold)
+        assert len(indices) == threshold
+        assert np.all(np.diff(indices) > 0)
+
+def test_decimation_keeps_a_spike():
+    spiky = np.zeros(2000)
+    spiky[1234] = 100
+    assert 1234 in lttb_indices(x, spiky, threshold=50)
+
+def test_scatter_trace_switches_to_webgl_past_the_threshold():
+    assert isinstance(scatter_trace(webgl_point_threshold), go.Scatter)
+    assert isinstance(scatter_trace(webgl_point_threshold + 1), go.Scattergl)
@@ -0,0 +1,49 @@
+import pandas as pd
+from search_index import build_search_index, search_bitmap
+
+#"los", "san", "del" and "mex" are both airport codes and ordinary place-name words
+frame = pd.DataFrame({
+    "location": [
+        "Los Angeles International Airport, CA (LAX/KLAX)",
+        "near San Francisco, CA",
+        "New Delhi-Indira Gandhi Airport (DEL/VIDP)",
+        "Lagos-Murtala Muhammed Airport (LOS/DNMM)",
+        "San Diego-Lindbergh Field, CA (SAN/KSAN)",
+        "3 km NE of Brussel-Zaventem Airport (BRU)",
+        "Mexico City Airport (MEX/MMMX)",
+        "near Mexicali"
+    ],
+    "operator": ["Delta Air Lines", "United Airlines", "Air India", "Nigeria Airways", "Pacific Southwest Airlines",
+                 "Sabena", "Mexicana", "Aeromexico"],
+    "type": ["B747", "B737", "A320", "B707", "B727", "B707", "B727", "DC-9"]
+})
+index = build_search_index(frame)
+
+def rows(query):
+    return search_bitmap(index, query).nonzero()[0].tolist()
+
+def test_multi_word_city_names_match_despite_colliding_codes():
+    assert rows("Los Angeles") == [0]
+    assert rows("San Francisco") == [1]
+    assert rows("New Delhi") == [2]
+    assert rows("mex") == [6, 7]
+
+def test_uppercase_code_term_skips_prefix_matches():
+    assert rows("BRU") == [5]
+    assert rows("MEX") == [6]
+    assert rows("klax") == [0]
+
+def test_uppercase_code_term_still_matches_the_exact_word():
+    assert rows("LOS") == [0, 3]
+    assert rows("SAN") == [1, 4]
+
+def test_all_caps_multi_word_city_names():
+    assert rows("LOS ANGELES") == [0]
+    assert rows("SAN FRANCISCO") == [1]
+    assert rows("SAN DIEGO") == [4]
+
+def test_lowercase_terms_match_by_prefix():
+    assert rows("los") == [0, 3]
+    assert rows("bru") == [5]
+    assert rows("san fr") == [1]
+    assert rows("") == list(range(len(frame)))